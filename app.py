@@ -6,6 +6,23 @@ from typing import List
 # Import the SuggestParticipantAvailability tool and helpers
 from shopee_smart_arrange_meeting_bot_tools.tools.suggest_participant_availability import SuggestParticipantAvailability
 
+# Build the tool (and its API clients) once and keep it across re-runs
+@st.cache_resource
+def get_tool():
+    return SuggestParticipantAvailability()
+
+# Streamlit re-runs the whole script on every widget interaction, so memoize
+# the lookup per input to avoid repeating the calendar queries
+@st.cache_data(ttl=30, show_spinner=False)
+def suggest_availability(search_start_time, search_end_time, duration_minutes, emails):
+    # Call the tool's _run method directly
+    return get_tool()._run(
+        search_start_time=search_start_time,
+        search_end_time=search_end_time,
+        duration_minutes=duration_minutes,
+        emails=emails
+    )
+
 # Streamlit app
 def main():
     st.title("Participant Availability Suggestion Tool")
@@ -37,14 +54,8 @@ def main():
             # Parse inputs
             emails = [e.strip() for e in emails_input.split(",") if e.strip()]
 
-            # Instantiate the tool
-            tool = SuggestParticipantAvailability()
-            # Call the tool's _run method directly
-            results = tool._run(
-                search_start_time=start_input,
-                search_end_time=end_input,
-                duration_minutes=int(duration_minutes),
-                emails=emails
+            results = suggest_availability(
+                start_input, end_input, int(duration_minutes), emails
             )
 
             if isinstance(results, dict) and results.get("error"):
@@ -0,0 +1,54 @@
+import collections
+
+from shopee_smart_arrange_meeting_bot_tools.common.get_offices import (
+    get_office_info_map,
+    get_office_infos,
+)
+from shopee_smart_arrange_meeting_bot_tools.common.get_rooms import get_rooms
+from shopee_smart_arrange_meeting_bot_tools.tools.cache import ttl_cache
+
+# Offices and rooms change rarely, but every tool call used to reload them
+CATALOG_TTL_SECONDS = 300
+
+
+@ttl_cache(maxsize=1, ttl=CATALOG_TTL_SECONDS)
+def get_cached_office_infos():
+    return get_office_infos()
+
+
+@ttl_cache(maxsize=1, ttl=CATALOG_TTL_SECONDS)
+def get_cached_rooms():
+    return get_rooms()
+
+
+@ttl_cache(maxsize=1, ttl=CATALOG_TTL_SECONDS)
+def get_cached_room_map():
+    return {x["id"]: x for x in get_cached_rooms()}
+
+
+@ttl_cache(maxsize=1, ttl=CATALOG_TTL_SECONDS)
+def get_cached_office_map():
+    return {x["id"]: x for x in get_cached_office_infos()}
+
+
+@ttl_cache(maxsize=1, ttl=CATALOG_TTL_SECONDS)
+def get_cached_office_info_map():
+    return get_office_info_map()
+
+
+@ttl_cache(maxsize=1, ttl=CATALOG_TTL_SECONDS)
+def get_cached_office_short_name_map():
+    office_short_name_map = {}
+    for x in get_cached_office_infos():
+        office_short_name_map.setdefault(x["officeShortName"], x)
+
+    return office_short_name_map
+
+
+@ttl_cache(maxsize=1, ttl=CATALOG_TTL_SECONDS)
+def get_cached_rooms_by_building():
+    rooms_by_building = collections.defaultdict(list)
+    for x in get_cached_rooms():
+        rooms_by_building[x["building_code"]].append(x)
+
+    return dict(rooms_by_building)
@@ -1,7 +1,8 @@
+import re
 import traceback
+from concurrent.futures import ThreadPoolExecutor
 from typing import Optional, List, Any
 
-from googleapiclient.discovery import build
 from gptsre_tools.tools.register_tool import ToolRegistry
 from langchain.callbacks.manager import (
     AsyncCallbackManagerForToolRun,
@@ -21,10 +22,12 @@ from shopee_smart_arrange_meeting_bot_tools.common.validate import (
 from shopee_smart_arrange_meeting_bot_tools.tools.find_available_rooms import (
     get_available_rooms_in_window,
 )
-from shopee_smart_arrange_meeting_bot_tools.common.google import (
-    get_shopee_google_credentials,
+from shopee_smart_arrange_meeting_bot_tools.tools.google_calendar import (
+    get_shopee_calendar_service,
 )
 
+EMAIL_PATTERN = re.compile(r"^[^@\s]+@[^@\s]+\.[^@\s]+$")
+
 
 class CreateMeetingInput(BaseModel):
     start_time: str = Field(
@@ -68,7 +71,7 @@ class CreateMeeting(BaseTool):
         optional_attendees=None,
         run_manager: Optional[CallbackManagerForToolRun] = None,
     ) -> Any:
-        service = build("calendar", "v3", credentials=get_shopee_google_credentials())
+        service = get_shopee_calendar_service()
 
         if not title:
             return {"error": "title cannot be empty"}
@@ -84,56 +87,42 @@ class CreateMeeting(BaseTool):
         if not (attendees + optional_attendees):
             return {"error": "cannot create a meeting with no participants"}
 
-        err = verify_emails_validity(self.smart_api, attendees + optional_attendees)
-        if err:
+        # Reject malformed addresses locally and only send unique ones upstream
+        participants = list(dict.fromkeys(attendees + optional_attendees))
+        invalid_emails = [x for x in participants if not EMAIL_PATTERN.match(x)]
+        if invalid_emails:
             return {
                 "error": "could not verify email addresses",
-                "details": err,
+                "details": [
+                    {"email": x, "error": "invalid email address"}
+                    for x in invalid_emails
+                ],
             }
 
         if not room_ids:
             room_ids = []
 
-        if room_ids:
-            resolved_rooms, errors = normalize_room_identifier_to_room(room_ids)
-            if len(resolved_rooms) != len(room_ids):
-                return errors
+        start_dt = normalize_time_format(start_time)
+        end_dt = normalize_time_format(end_time)
 
-            room_ids = [x["id"] for x in resolved_rooms]
-            request_body = {
-                "timeMin": normalize_time_format(start_time).isoformat(),
-                "timeMax": normalize_time_format(end_time).isoformat(),
-                "items": [{"id": room_id} for room_id in room_ids],
-            }
-
-            freebusy_rooms_response = (
-                service.freebusy().query(body=request_body).execute()
+        # Validate attendees while the room availability query is in flight
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            email_check = executor.submit(
+                verify_emails_validity, self.smart_api, participants
+            )
+            room_ids, room_errors = check_rooms_availability(
+                service, room_ids, start_dt, end_dt
             )
+            err = email_check.result()
+
+        if err:
+            return {
+                "error": "could not verify email addresses",
+                "details": err,
+            }
 
-            errors = []
-            for room_id in room_ids:
-                subset = {
-                    "calendars": {
-                        room_id: freebusy_rooms_response["calendars"][room_id]
-                    }
-                }
-
-                windows = get_available_rooms_in_window(
-                    subset["calendars"],
-                    normalize_time_format(start_time),
-                    normalize_time_format(end_time),
-                )
-
-                if len(windows) == 0:
-                    errors.append(
-                        {
-                            "room_id": room_id,
-                            "error": "not available for booking",
-                        }
-                    )
-
-            if errors:
-                return errors
+        if room_errors:
+            return room_errors
 
         event_attendees = []
         event_attendees.extend([{"email": x} for x in attendees + room_ids])
@@ -142,20 +131,16 @@ class CreateMeeting(BaseTool):
         )
 
         try:
-            service = build(
-                "calendar", "v3", credentials=get_shopee_google_credentials()
-            )
-
             event = {
                 "summary": title,
                 "description": description,
                 "location": "",
                 "start": {
-                    "dateTime": normalize_time_format(start_time).isoformat(),
+                    "dateTime": start_dt.isoformat(),
                     "timeZone": "Asia/Singapore",
                 },
                 "end": {
-                    "dateTime": normalize_time_format(end_time).isoformat(),
+                    "dateTime": end_dt.isoformat(),
                     "timeZone": "Asia/Singapore",
                 },
                 "attendees": event_attendees,
@@ -179,3 +164,40 @@ class CreateMeeting(BaseTool):
     ) -> Any:
         """Use the tool asynchronously."""
         raise NotImplementedError("knowledge_base does not support async")
+
+
+def check_rooms_availability(service, room_ids, start_dt, end_dt):
+    if not room_ids:
+        return [], []
+
+    resolved_rooms, errors = normalize_room_identifier_to_room(room_ids)
+    if len(resolved_rooms) != len(room_ids):
+        return room_ids, errors
+
+    room_ids = [x["id"] for x in resolved_rooms]
+    request_body = {
+        "timeMin": start_dt.isoformat(),
+        "timeMax": end_dt.isoformat(),
+        "items": [{"id": room_id} for room_id in room_ids],
+    }
+
+    freebusy_rooms_response = service.freebusy().query(body=request_body).execute()
+
+    available_room_ids = set(
+        get_available_rooms_in_window(
+            freebusy_rooms_response["calendars"],
+            start_dt,
+            end_dt,
+        )
+    )
+
+    errors = [
+        {
+            "room_id": room_id,
+            "error": "not available for booking",
+        }
+        for room_id in room_ids
+        if room_id not in available_room_ids
+    ]
+
+    return room_ids, errors
@@ -1,9 +1,9 @@
+import bisect
 import datetime
 import traceback
 from typing import Optional, List, Dict, Any
 
 import pytz
-from googleapiclient.discovery import build
 from gptsre_tools.tools.register_tool import ToolRegistry
 from langchain.callbacks.manager import (
     CallbackManagerForToolRun,
@@ -11,23 +11,30 @@ from langchain.callbacks.manager import (
 from langchain_core.tools import BaseTool
 from pydantic import BaseModel, Field
 
-from shopee_smart_arrange_meeting_bot_tools.common.get_offices import get_office_infos
 from shopee_smart_arrange_meeting_bot_tools.common.get_rooms import (
-    get_rooms,
     normalize_room_identifier_to_room,
 )
-from shopee_smart_arrange_meeting_bot_tools.common.lib import (
-    normalize_time_format,
-    divide_into_chunk,
+from shopee_smart_arrange_meeting_bot_tools.common.lib import normalize_time_format
+from shopee_smart_arrange_meeting_bot_tools.tools.catalog import (
+    get_cached_office_map,
+    get_cached_office_short_name_map,
+    get_cached_room_map,
+    get_cached_rooms_by_building,
 )
-from shopee_smart_arrange_meeting_bot_tools.common.google import (
-    get_shopee_google_credentials,
+from shopee_smart_arrange_meeting_bot_tools.tools.google_calendar import (
+    MAX_FREEBUSY_ITEMS,
+    execute_freebusy_queries,
+    get_shopee_calendar_service,
+    iter_chunks,
+    parse_rfc3339,
 )
 from shopee_smart_arrange_meeting_bot_tools.tools.search_room import (
     SearchRoomInput,
     SearchRoom,
 )
 
+SGT = pytz.timezone("Asia/Singapore")
+
 
 class FindAvailableRoomsInput(BaseModel):
     office_code: str = Field(
@@ -67,23 +74,28 @@ class FindAvailableRooms(BaseTool):
         if not office_code:
             return {"error": "office_code cannot be empty"}
 
-        office = [
-            x
-            for x in get_office_infos()
-            if x["id"] == office_code or x["officeShortName"] == office_code
-        ]
+        office = get_cached_office_map().get(office_code)
         if not office:
-            return {"error": f"could not resolve {office_code} to an office"}
+            office = get_cached_office_short_name_map().get(office_code)
 
-        office = office[0]
-
-        if not room_filter:
-            room_filter = SearchRoomInput()
+        if not office:
+            return {"error": f"could not resolve {office_code} to an office"}
 
-        room_filter.office_code_exact = office["id"]
-        rooms = SearchRoom().run(
-            tool_input=room_filter.model_dump(),
-        )
+        default_filter = SearchRoomInput()
+        if not room_filter or room_filter == default_filter:
+            # Nothing to search on besides the office, so skip the SearchRoom
+            # round trip and apply its default capacity filter directly
+            minimum_capacity = int(default_filter.minimum_capacity)
+            rooms = [
+                x
+                for x in get_cached_rooms_by_building().get(office["id"], [])
+                if x["seating_capacity"] >= minimum_capacity
+            ]
+        else:
+            room_filter.office_code_exact = office["id"]
+            rooms = SearchRoom().run(
+                tool_input=room_filter.model_dump(),
+            )
 
         return CheckRoomAvailability().run(
             tool_input=CheckRoomAvailabilityInput(
@@ -150,24 +162,13 @@ class CheckRoomAvailability(BaseTool):
         if not room_ids:
             return {"error": "room_ids cannot be empty"}
 
-        all_rooms = get_rooms()
-
-        rooms = []
-        for room_id in room_ids:
-            for room in all_rooms:
-                if room["id"] == room_id:
-                    rooms.append(room)
-
-        service = build("calendar", "v3", credentials=get_shopee_google_credentials())
+        all_rooms_map = get_cached_room_map()
+        rooms = [all_rooms_map[x] for x in room_ids if x in all_rooms_map]
 
         windows = [
             (
-                normalize_time_format(window_start).astimezone(
-                    pytz.timezone("Asia/Singapore")
-                ),
-                normalize_time_format(window_end).astimezone(
-                    pytz.timezone("Asia/Singapore")
-                ),
+                normalize_time_format(window_start).astimezone(SGT),
+                normalize_time_format(window_end).astimezone(SGT),
             )
         ]
 
@@ -183,23 +184,30 @@ class CheckRoomAvailability(BaseTool):
 
         try:
             relevant_rooms = rooms
-            relevant_rooms_map = dict([(x["id"], x) for x in relevant_rooms])
+            seating_capacity = {x["id"]: x["seating_capacity"] for x in relevant_rooms}
 
-            for chunk in divide_into_chunk(relevant_rooms, split_at=50):
-                request_body = {
-                    "timeMin": min(start for start, _ in windows).isoformat(),
-                    "timeMax": max(end for _, end in windows).isoformat(),
+            time_min = min(start for start, _ in windows).isoformat()
+            time_max = max(end for _, end in windows).isoformat()
+            request_bodies = [
+                {
+                    "timeMin": time_min,
+                    "timeMax": time_max,
                     "calendarExpansionMax": 50,  # this is the maximum you can go
-                    "items": [{"id": cid["id"]} for cid in chunk],
+                    "items": items,
                 }
-
-                freebusy_rooms_response = (
-                    service.freebusy().query(body=request_body).execute()
+                for items in iter_chunks(
+                    ({"id": x["id"]} for x in relevant_rooms), MAX_FREEBUSY_ITEMS
                 )
+            ]
 
-                for idx, window in enumerate(resp):
-                    start = normalize_time_format(window["start"])
-                    end = normalize_time_format(window["end"])
+            service = get_shopee_calendar_service()
+
+            # One batched round trip for all chunks; responses come back in
+            # chunk order so the early exit below still prefers earlier rooms
+            for freebusy_rooms_response in execute_freebusy_queries(
+                service, request_bodies
+            ):
+                for window, (start, end) in zip(resp, windows):
                     rooms = get_available_rooms_in_window(
                         freebusy_rooms_response["calendars"],
                         start,
@@ -207,18 +215,18 @@ class CheckRoomAvailability(BaseTool):
                     )
 
                     window["available_rooms"].extend(rooms)
-                    window["available_rooms"] = sorted(
-                        window["available_rooms"],
-                        key=lambda x: relevant_rooms_map[x]["seating_capacity"],
-                    )
 
                 do_all_windows_have_available_rooms = all(
-                    [x for x in resp if len(x["available_rooms"]) > 0]
+                    len(x["available_rooms"]) > 0 for x in resp
                 )
 
                 if do_all_windows_have_available_rooms:
                     break
 
+            # Sort once all chunks are in rather than re-sorting per chunk
+            for window in resp:
+                window["available_rooms"].sort(key=seating_capacity.__getitem__)
+
             return resp
         except Exception:
             return str(traceback.format_exc())
@@ -230,26 +238,18 @@ def get_available_rooms_in_window(
     available_rooms = []
 
     for calendar_id, calendar_info in freebusy_data.items():
-        busy_periods = calendar_info.get("busy", [])
-        is_free = True
-
         if calendar_info.get("errors"):
             continue
 
-        for busy in busy_periods:
-            busy_start = datetime.datetime.fromisoformat(
-                busy["start"].replace("Z", "+00:00")
-            )
-            busy_end = datetime.datetime.fromisoformat(
-                busy["end"].replace("Z", "+00:00")
-            )
-
-            # Check if there's an overlap
-            if not (end <= busy_start or start >= busy_end):
-                is_free = False
-                break
-
-        if is_free:
+        # Busy periods come back merged and sorted by start, so only the last
+        # one starting before the window ends can overlap it
+        busy_periods = calendar_info.get("busy", [])
+        idx = bisect.bisect_left(busy_periods, end, key=_parse_busy_start) - 1
+        if idx < 0 or parse_rfc3339(busy_periods[idx]["end"]) <= start:
             available_rooms.append(calendar_id)
 
     return available_rooms
+
+
+def _parse_busy_start(busy):
+    return parse_rfc3339(busy["start"])
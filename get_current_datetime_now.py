@@ -9,6 +9,8 @@ from langchain.callbacks.manager import (
 from langchain_core.tools import BaseTool
 from pydantic import BaseModel
 
+SGT = pytz.timezone("Asia/Singapore")
+
 
 class GetCurrentDateTimeNow(BaseModel):
     pass
@@ -28,7 +30,7 @@ class GetCurrentDateTimeNow(BaseTool):
         self,
         run_manager: Optional[CallbackManagerForToolRun] = None,
     ) -> Any:
-        now = datetime.datetime.now(tz=pytz.timezone("Asia/Singapore"))
+        now = datetime.datetime.now(tz=SGT)
         return {
             "iso8601": now.isoformat(),  # Full datetime (with tz)
             "date": now.date().isoformat(),  # Just the date (e.g., "2026-06-25")
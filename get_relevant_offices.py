@@ -1,3 +1,4 @@
+from concurrent.futures import ThreadPoolExecutor
 from typing import Optional, List, Any
 
 from gptsre_tools.tools.register_tool import ToolRegistry
@@ -7,10 +8,10 @@ from langchain.callbacks.manager import (
 from langchain_core.tools import BaseTool
 from pydantic import BaseModel, Field
 
-from shopee_smart_arrange_meeting_bot_tools.common.get_offices import (
-    get_office_info_map,
-)
 from shopee_smart_arrange_meeting_bot_tools.common.smart import SmartAPI
+from shopee_smart_arrange_meeting_bot_tools.tools.catalog import (
+    get_cached_office_info_map,
+)
 
 
 class GetRelevantOfficesInput(BaseModel):
@@ -34,10 +35,19 @@ class GetRelevantOffices(BaseTool):
         run_manager: Optional[CallbackManagerForToolRun] = None,
     ) -> Any:
         resp = []
-        office_info_map = get_office_info_map()
+        office_info_map = get_cached_office_info_map()
+
+        unique_emails = list(set(emails))
+        if not unique_emails:
+            return resp
+
+        # Look the staff records up concurrently; each one is an HTTP call
+        with ThreadPoolExecutor(max_workers=min(16, len(unique_emails))) as executor:
+            staff_info_resps = list(
+                executor.map(self.smart_api.get_hris_staff_basic_info, unique_emails)
+            )
 
-        for email in set(emails):
-            staff_info_resp = self.smart_api.get_hris_staff_basic_info(email)
+        for email, staff_info_resp in zip(unique_emails, staff_info_resps):
             if staff_info_resp.error:
                 resp.append(
                     {
@@ -0,0 +1,119 @@
+import datetime
+import itertools
+import random
+import sys
+import threading
+import time
+
+from googleapiclient.discovery import build
+from googleapiclient.errors import HttpError
+
+from shopee_smart_arrange_meeting_bot_tools.common.google import (
+    get_sea_google_credentials,
+    get_shopee_google_credentials,
+)
+
+# httplib2.Http underneath a service is not thread-safe, so each thread keeps
+# its own service object instead of sharing one process-wide.
+_local = threading.local()
+
+# Google Calendar rejects batch requests carrying more than 50 calls
+MAX_BATCH_SIZE = 50
+
+# A single freebusy query accepts at most 50 calendars in "items"
+MAX_FREEBUSY_ITEMS = 50
+
+# Retries for rate-limited or transient failures, with exponential backoff
+NUM_RETRIES = 4
+MAX_BACKOFF_SECONDS = 10
+
+
+if sys.version_info >= (3, 11):
+    # fromisoformat accepts the trailing "Z" that Google returns since 3.11
+    parse_rfc3339 = datetime.datetime.fromisoformat
+else:
+
+    def parse_rfc3339(value):
+        return datetime.datetime.fromisoformat(value.replace("Z", "+00:00"))
+
+
+def _get_calendar_service(name, get_credentials):
+    service = getattr(_local, name, None)
+    if service is None:
+        service = build(
+            "calendar", "v3", credentials=get_credentials(), cache_discovery=False
+        )
+        setattr(_local, name, service)
+
+    return service
+
+
+def get_shopee_calendar_service():
+    return _get_calendar_service("shopee", get_shopee_google_credentials)
+
+
+def get_sea_calendar_service():
+    return _get_calendar_service("sea", get_sea_google_credentials)
+
+
+def execute_freebusy_queries(service, bodies):
+    if len(bodies) == 1:
+        query = service.freebusy().query(body=bodies[0])
+        return [query.execute(num_retries=NUM_RETRIES)]
+
+    responses = [None] * len(bodies)
+    pending = range(len(bodies))
+
+    for attempt in range(NUM_RETRIES + 1):
+        failed = []
+
+        def collect(request_id, response, exception):
+            if exception is None:
+                responses[int(request_id)] = response
+            elif attempt < NUM_RETRIES and _is_retryable(exception):
+                failed.append(int(request_id))
+            else:
+                raise exception
+
+        # Multiplex the queries into as few HTTP round trips as the API allows
+        for chunk in iter_chunks(pending, MAX_BATCH_SIZE):
+            batch = service.new_batch_http_request(callback=collect)
+            for idx in chunk:
+                batch.add(
+                    service.freebusy().query(body=bodies[idx]), request_id=str(idx)
+                )
+            try:
+                batch.execute()
+            except HttpError as e:
+                # Batch requests have no built-in retries; a throttled or
+                # failed batch call is retried like its individual calls
+                if attempt == NUM_RETRIES or not _is_retryable(e):
+                    raise
+                failed.extend(chunk)
+
+        if not failed:
+            break
+
+        # Back off with jitter and resend only the calls that did not succeed
+        time.sleep(random.uniform(0, min(2**attempt, MAX_BACKOFF_SECONDS)))
+        pending = sorted(set(failed))
+
+    return responses
+
+
+def _is_retryable(exception):
+    if not isinstance(exception, HttpError):
+        return False
+
+    status = exception.resp.status
+    if status == 403:
+        # 403 is only transient when it reports a rate limit
+        return b"ratelimitexceeded" in exception.content.lower()
+
+    return status == 429 or status >= 500
+
+
+def iter_chunks(iterable, size):
+    iterator = iter(iterable)
+    while chunk := list(itertools.islice(iterator, size)):
+        yield chunk
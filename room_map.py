@@ -1,5 +1,7 @@
 import collections
+import functools
 import traceback
+from concurrent.futures import ThreadPoolExecutor
 from typing import Optional, List, Annotated, Any
 
 from gptsre_tools.tools.register_tool import ToolRegistry
@@ -59,7 +61,7 @@ class ShowRoomMap(BaseTool):
 
         if seatalk_group_id and seatalk_thread_id:
             errors = []
-            messages = []
+            level_messages = []
 
             for level, rooms in grouped_by_level.items():
                 if not rooms[0]["direction_image_path"]:
@@ -88,7 +90,7 @@ class ShowRoomMap(BaseTool):
                         "message": {
                             "tag": "image",
                             "image": {
-                                "content": get_base64_encoded_image(
+                                "content": get_cached_base64_encoded_image(
                                     rooms[0]["direction_image_path"]
                                 ),
                             },
@@ -97,23 +99,30 @@ class ShowRoomMap(BaseTool):
                     },
                 ]
 
-                messages.extend(room_messages)
-
-            try:
-                for m in messages:
-                    resp = get_seatalk_session().post(
-                        "https://openapi.seatalk.io/messaging/v2/group_chat",
-                        json=m,
-                    )
-
-                    if resp.status_code != 200:
-                        raise RuntimeError(resp.status_code, resp.text)
-
-                    if resp.json()["code"] != 0:
-                        raise RuntimeError(resp.status_code, resp.text, m)
-
-            except RuntimeError:
-                return traceback.format_exc()
+                level_messages.append((rooms, room_messages))
+
+            # Levels are independent, so post them concurrently; the text and
+            # image for one level are still sent in order by the same worker
+            if level_messages:
+                with ThreadPoolExecutor(
+                    max_workers=min(8, len(level_messages))
+                ) as executor:
+                    futures = [
+                        (rooms, executor.submit(post_seatalk_messages, messages))
+                        for rooms, messages in level_messages
+                    ]
+
+                for rooms, future in futures:
+                    try:
+                        future.result()
+                    except RuntimeError:
+                        errors.append(
+                            {
+                                "rooms": rooms,
+                                "error": "could not send directions to these rooms",
+                                "details": traceback.format_exc(),
+                            }
+                        )
 
             return {
                 "channel": "seatalk",
@@ -145,3 +154,23 @@ class ShowRoomMap(BaseTool):
             "data": urls,
             "errors": errors,
         }
+
+
+def post_seatalk_messages(messages):
+    for m in messages:
+        resp = get_seatalk_session().post(
+            "https://openapi.seatalk.io/messaging/v2/group_chat",
+            json=m,
+        )
+
+        if resp.status_code != 200:
+            raise RuntimeError(resp.status_code, resp.text)
+
+        if resp.json()["code"] != 0:
+            raise RuntimeError(resp.status_code, resp.text, m)
+
+
+# Direction images are static files, so encode each one only once
+@functools.lru_cache(maxsize=256)
+def get_cached_base64_encoded_image(path):
+    return get_base64_encoded_image(path)
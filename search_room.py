@@ -7,8 +7,11 @@ from langchain.callbacks.manager import (
 from langchain_core.tools import BaseTool
 from pydantic import BaseModel, Field
 
-from shopee_smart_arrange_meeting_bot_tools.common.get_offices import get_office_infos
-from shopee_smart_arrange_meeting_bot_tools.common.get_rooms import get_rooms
+from shopee_smart_arrange_meeting_bot_tools.tools.catalog import (
+    get_cached_office_infos,
+    get_cached_office_map,
+    get_cached_rooms,
+)
 
 
 class SearchRoomInput(BaseModel):
@@ -76,27 +79,26 @@ class SearchRoom(BaseTool):
         ):
             return {"error": "require at least one parameter to search"}
 
-        office_filter = []
-
         if office_code_exact:
-            office_filter.append(lambda x: x["id"] == office_code_exact)
-
-        if office_name_contains:
-            office_filter.append(
-                lambda x: office_name_contains.lower() in x["name"].lower()
-            )
-
-        if country_contains:
-            office_filter.append(
-                lambda x: country_contains.lower() in x["country"].lower()
-            )
-
-        if city_contains:
-            office_filter.append(
-                lambda x: x["city"] and city_contains.lower() in x["city"].lower()
+            office = get_cached_office_map().get(office_code_exact)
+            offices = [office] if office else []
+        else:
+            offices = get_cached_office_infos()
+
+        office_name_part = (office_name_contains or "").lower()
+        country_part = (country_contains or "").lower()
+        city_part = (city_contains or "").lower()
+
+        def matches_office(x):
+            return (
+                (not office_name_part or office_name_part in x["name"].lower())
+                and (not country_part or country_part in x["country"].lower())
+                and (
+                    not city_part or bool(x["city"] and city_part in x["city"].lower())
+                )
             )
 
-        offices = [x for x in get_office_infos() if all([y(x) for y in office_filter])]
+        offices = [x for x in offices if matches_office(x)]
 
         # return early since there are office filters, but nothing returned
         if not offices and any(
@@ -106,19 +108,20 @@ class SearchRoom(BaseTool):
 
         room_filter = []
         if room_name_contains:
-            room_filter.append(
-                lambda x: room_name_contains.lower() in x["title"].lower()
-            )
+            room_name_part = room_name_contains.lower()
+            room_filter.append(lambda x: room_name_part in x["title"].lower())
 
         if level:
-            room_filter.append(lambda x: x["level"] == int(level))
+            level = int(level)
+            room_filter.append(lambda x: x["level"] == level)
 
         if minimum_capacity:
-            room_filter.append(lambda x: x["seating_capacity"] >= int(minimum_capacity))
+            minimum_capacity = int(minimum_capacity)
+            room_filter.append(lambda x: x["seating_capacity"] >= minimum_capacity)
 
         if offices:
-            office_ids = [x["id"] for x in offices]
+            office_ids = frozenset(x["id"] for x in offices)
             room_filter.append(lambda x: x["building_code"] in office_ids)
 
-        rooms = [x for x in get_rooms() if all([y(x) for y in room_filter])]
+        rooms = [x for x in get_cached_rooms() if all(y(x) for y in room_filter)]
         return rooms
@@ -1,10 +1,15 @@
+import bisect
 import datetime
-import traceback
+import functools
+import heapq
+import logging
+import operator
+from concurrent.futures import ThreadPoolExecutor
 from datetime import timedelta
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Tuple
 
 import pytz
-from googleapiclient.discovery import build
+from googleapiclient.errors import HttpError
 from gptsre_tools.tools.register_tool import ToolRegistry
 from langchain.callbacks.manager import (
     CallbackManagerForToolRun,
@@ -19,104 +24,166 @@ from shopee_smart_arrange_meeting_bot_tools.common.lib import (
     normalize_time_format,
 )
 from shopee_smart_arrange_meeting_bot_tools.common.smart import SmartAPI
-from shopee_smart_arrange_meeting_bot_tools.common.google import (
-    get_sea_google_credentials,
-    get_shopee_google_credentials,
+from shopee_smart_arrange_meeting_bot_tools.tools.cache import TTLCache
+from shopee_smart_arrange_meeting_bot_tools.tools.google_calendar import (
+    MAX_FREEBUSY_ITEMS,
+    execute_freebusy_queries,
+    get_sea_calendar_service,
+    get_shopee_calendar_service,
+    iter_chunks,
+    parse_rfc3339,
 )
 
+logger = logging.getLogger(__name__)
+
+SGT = pytz.timezone("Asia/Singapore")
+
+# freebusy rejects ranges longer than about three months ("timeRangeTooLong")
+MAX_FREEBUSY_RANGE = timedelta(days=80)
+
+# Number of suggestions returned; slicing stops as soon as this many are found
+MAX_SUGGESTED_SLOTS = 10
+
+# A working day's periods as offsets from midnight: (start, end, is_lunch_break)
+PERIOD_OFFSETS = (
+    (timedelta(hours=9, minutes=30), timedelta(hours=12), False),
+    (timedelta(hours=12), timedelta(hours=14), True),
+    (timedelta(hours=14), timedelta(hours=18, minutes=30), False),
+)
+
+# Users tend to re-run a search while refining it, so keep each calendar's busy
+# blocks for a minute, per (tenant, email, range) to share across attendee lists
+BUSY_CACHE = TTLCache(maxsize=10_000, ttl=60)
+
+# Which tenant ("shopee" or "sea") can read each email's calendar; this rarely
+# changes, so once known the email is only queried against that tenant
+EMAIL_TENANT_CACHE = TTLCache(maxsize=50_000, ttl=3600)
+
+
+def chunk_range(start, end, max_span=MAX_FREEBUSY_RANGE):
+    while True:
+        chunk_end = min(start + max_span, end)
+        yield start, chunk_end
+        if chunk_end >= end:
+            break
+        start = chunk_end
+
+
+def query_busy(tenant, service, emails, start, end) -> Dict[str, Dict]:
+    calendars = {}
+    missing_emails = []
+    for email in emails:
+        calendar = BUSY_CACHE.get((tenant, email, start, end))
+        if calendar is None:
+            missing_emails.append(email)
+        else:
+            calendars[email] = calendar
+
+    # One body per (time window, 50 calendars), all sent as a single batch
+    bodies = [
+        {
+            "timeMin": chunk_start.isoformat(),
+            "timeMax": chunk_end.isoformat(),
+            "timeZone": "Asia/Singapore",
+            "items": items,
+        }
+        for chunk_start, chunk_end in chunk_range(start, end)
+        for items in iter_chunks(
+            ({"id": x} for x in missing_emails), MAX_FREEBUSY_ITEMS
+        )
+    ]
+
+    fetched = {}
+    for response in execute_freebusy_queries(service, bodies):
+        for email, calendar in response["calendars"].items():
+            merged = fetched.setdefault(email, {"busy": []})
+            if calendar.get("errors", None):
+                merged.setdefault("errors", []).extend(calendar["errors"])
+            merged["busy"].extend(calendar.get("busy", []))
+
+    for email, calendar in fetched.items():
+        BUSY_CACHE.set((tenant, email, start, end), calendar)
+
+    calendars.update(fetched)
+    return calendars
+
+
+def merge_busy_blocks(busy_by_calendar: List[List[Dict]]) -> List[List[int]]:
+    # Work in POSIX seconds from here on: int compares and additions are much
+    # cheaper than timezone-aware datetime arithmetic
+    intervals_by_calendar = [
+        [
+            (
+                int(parse_rfc3339(b["start"]).timestamp()),
+                int(parse_rfc3339(b["end"]).timestamp()),
+            )
+            for b in busy
+        ]
+        for busy in busy_by_calendar
+    ]
+
+    # Merge all busy blocks across calendars; each calendar's blocks are
+    # already in order, so a k-way merge avoids re-sorting the combined list
+    merged = []
+    for busy_start, busy_end in heapq.merge(*intervals_by_calendar):
+        if merged and busy_start <= merged[-1][1]:
+            merged[-1][1] = max(merged[-1][1], busy_end)
+        else:
+            merged.append([busy_start, busy_end])
+    return merged
+
 
 def determine_for_one_period(
     start: datetime.datetime,
     end: datetime.datetime,
     duration: datetime.timedelta,
-    calendar_ids: Dict[str, str],
-) -> List[Dict]:
-    shopee_service = build(
-        "calendar", "v3", credentials=get_shopee_google_credentials()
-    )
-    sea_service = build("calendar", "v3", credentials=get_sea_google_credentials())
-
-    shopee_body = {
-        "timeMin": start.isoformat(),
-        "timeMax": end.isoformat(),
-        "timeZone": "Asia/Singapore",
-        "items": [{"id": k} for (k, v) in calendar_ids.items() if v == "shopee"],
-    }
-
-    sea_body = {
-        "timeMin": start.isoformat(),
-        "timeMax": end.isoformat(),
-        "timeZone": "Asia/Singapore",
-        "items": [{"id": k} for (k, v) in calendar_ids.items() if v == "sea"],
-    }
-
-    shopee_response = shopee_service.freebusy().query(body=shopee_body).execute()
-    sea_response = sea_service.freebusy().query(body=sea_body).execute()
-
-    busy_slots = {}
-
-    shopee_calendar_list = list(shopee_response.get("calendars", {}).items())
-    sea_calendar_list = list(sea_response.get("calendars", {}).items())
-    for email, calendar in shopee_calendar_list + sea_calendar_list:
-        if calendar.get("error", None):
-            continue
-
-        busy_slots[email] = calendar["busy"]
-
-    # Merge all busy blocks across calendars
-    busy_blocks = []
-    for cal in calendar_ids:
-        busy_blocks.extend(busy_slots[cal])
-
-    def merge_intervals(intervals):
-        if not intervals:
-            return []
-        intervals.sort(key=lambda x: x["start"])
-        merged = [intervals[0]]
-        for current in intervals[1:]:
-            last = merged[-1]
-            if current["start"] <= last["end"]:
-                last["end"] = max(last["end"], current["end"])
-            else:
-                merged.append(current)
-        return merged
-
-    merged_busy = merge_intervals(
-        [
-            {
-                "start": datetime.datetime.fromisoformat(
-                    b["start"].replace("Z", "+00:00")
-                ),
-                "end": datetime.datetime.fromisoformat(b["end"].replace("Z", "+00:00")),
-            }
-            for b in busy_blocks
-        ]
-    )
-
-    # Find all free gaps between busy blocks
+    merged_busy: List[List[int]],
+    max_slots: int = 10,
+) -> List[Tuple[int, int]]:
+    start_ts = int(start.timestamp())
+    end_ts = int(end.timestamp())
+    duration_s = int(duration.total_seconds())
+
+    # Find all free gaps between busy blocks inside [start, end). Merged blocks
+    # are disjoint, so their ends are sorted too and we can jump straight to
+    # the first block still running at the start of the period
     free_slots = []
-    current = start
-    for block in merged_busy:
-        if current < block["start"]:
-            free_slots.append({"start": current, "end": block["start"]})
-        current = max(current, block["end"])
-    if current < end:
-        free_slots.append({"start": current, "end": end})
+    current = start_ts
+    first = bisect.bisect_right(merged_busy, start_ts, key=operator.itemgetter(1))
+    for i in range(first, len(merged_busy)):
+        busy_start, busy_end = merged_busy[i]
+        if busy_start >= end_ts:
+            break
+        if current < busy_start:
+            free_slots.append((current, busy_start))
+        current = max(current, busy_end)
+    if current < end_ts:
+        free_slots.append((current, end_ts))
 
     # Slice each free slot into fixed-size windows of `duration`
     available_windows = []
-    for slot in free_slots:
-        window_start = slot["start"]
-        while window_start + duration <= slot["end"]:
-            window_end = window_start + duration
-            available_windows.append(
-                {"start": window_start.isoformat(), "end": window_end.isoformat()}
-            )
-            window_start = window_end  # move to next window
+    for slot_start, slot_end in free_slots:
+        for window_start in range(slot_start, slot_end - duration_s + 1, duration_s):
+            available_windows.append((window_start, window_start + duration_s))
+            if len(available_windows) >= max_slots:
+                return available_windows
 
     return available_windows
 
 
+def format_slots(slots, tz, attendees):
+    # Serialize only the slots that are actually returned
+    return [
+        {
+            "start": datetime.datetime.fromtimestamp(window_start, tz).isoformat(),
+            "end": datetime.datetime.fromtimestamp(window_end, tz).isoformat(),
+            "lunch_hours": lunch_hours,
+            "attendees": attendees,
+        }
+        for window_start, window_end, lunch_hours in slots
+    ]
+
+
 class SuggestParticipantAvailabilityInput(BaseModel):
     search_start_time: str = Field(
         description="date time in format of YYYY-MM-dd HH:MM"
@@ -145,6 +212,9 @@ class SuggestParticipantAvailability(BaseTool):
         emails,
         run_manager: Optional[CallbackManagerForToolRun] = None,
     ) -> Any:
+        # Calendar ids are case-insensitive; query each address only once
+        emails = list(dict.fromkeys(x.strip().lower() for x in emails))
+
         err = verify_emails_validity(self.smart_api, emails)
         if err:
             return {
@@ -152,19 +222,19 @@ class SuggestParticipantAvailability(BaseTool):
                 "details": err,
             }
 
-        shopee_service = build(
-            "calendar", "v3", credentials=get_shopee_google_credentials()
-        )
-        sea_service = build("calendar", "v3", credentials=get_sea_google_credentials())
+        # These are this thread's cached services; each is handed to exactly
+        # one worker below while this thread waits, so none is shared
+        shopee_service = get_shopee_calendar_service()
+        sea_service = get_sea_calendar_service()
 
         try:
             start_time = normalize_time_format(search_start_time)
             end_time = normalize_time_format(search_end_time)
             meeting_min_duration = timedelta(minutes=duration_minutes)
 
-            start_time = start_time.astimezone(pytz.timezone("Asia/Singapore"))
-            end_time = end_time.astimezone(pytz.timezone("Asia/Singapore"))
-            now = datetime.datetime.now().astimezone(pytz.timezone("Asia/Singapore"))
+            start_time = start_time.astimezone(SGT)
+            end_time = end_time.astimezone(SGT)
+            now = datetime.datetime.now().astimezone(SGT)
             now_threshold = now - timedelta(hours=1)
 
             time_debug_details = {
@@ -185,42 +255,73 @@ class SuggestParticipantAvailability(BaseTool):
                     "details": time_debug_details,
                 }
 
-            # Validate for calendar access
-            body = {
-                "timeMin": start_time.isoformat(),
-                "timeMax": end_time.isoformat(),
-                "timeZone": "Asia/Singapore",
-                "items": [{"id": x} for x in emails],
-            }
+            if duration_minutes <= 0:
+                return {"error": "duration_minutes must be greater than 0"}
+
+            # Emails with a known tenant go to that tenant only; the rest are
+            # tried against both, which also tells us who can access them
+            tenant_emails = {"shopee": [], "sea": []}
+            for email in emails:
+                tenant = EMAIL_TENANT_CACHE.get(email)
+                for credential in (tenant,) if tenant else ("shopee", "sea"):
+                    tenant_emails[credential].append(email)
+
+            # Validate for calendar access; the two tenants are independent, so
+            # query them side by side (each service stays on one thread)
+            with ThreadPoolExecutor(max_workers=2) as executor:
+                shopee_future = executor.submit(
+                    query_busy,
+                    "shopee",
+                    shopee_service,
+                    tenant_emails["shopee"],
+                    start_time,
+                    end_time,
+                )
+                sea_future = executor.submit(
+                    query_busy,
+                    "sea",
+                    sea_service,
+                    tenant_emails["sea"],
+                    start_time,
+                    end_time,
+                )
+                calendars = {
+                    "shopee": shopee_future.result(),
+                    "sea": sea_future.result(),
+                }
 
             email_to_credential_map = {}
-            error_email_set = set()
 
-            shopee_response = shopee_service.freebusy().query(body=body).execute()
-            for email, calendar in shopee_response["calendars"].items():
-                if calendar.get("errors", None):
-                    error_email_set.add(email)
-                else:
-                    email_to_credential_map[email] = "shopee"
+            for credential in ("shopee", "sea"):
+                for email, calendar in calendars[credential].items():
+                    if not calendar.get("errors", None):
+                        email_to_credential_map[email] = credential
 
-            sea_response = sea_service.freebusy().query(body=body).execute()
-            for email, calendar in sea_response["calendars"].items():
-                if calendar.get("errors", None):
-                    error_email_set.add(email)
-                else:
-                    email_to_credential_map[email] = "sea"
+            for email, credential in email_to_credential_map.items():
+                EMAIL_TENANT_CACHE.set(email, credential)
 
-            error_emails = error_email_set - set(email_to_credential_map.keys())
+            # Anything neither tenant could read is an error, including emails
+            # that were missing from both responses altogether
+            error_emails = [x for x in emails if x not in email_to_credential_map]
 
             if error_emails:
                 return {
                     "error": "Could not access the calendar of the following emails",
-                    "emails": list(error_emails),
+                    "emails": error_emails,
                 }
 
+            # The validation queries above already cover the whole search
+            # range, so slice every period out of their busy blocks locally
+            merged_busy = merge_busy_blocks(
+                [
+                    calendars[credential][email]["busy"]
+                    for email, credential in email_to_credential_map.items()
+                ]
+            )
+
             work_days = generate_work_blocks(start_time, end_time)
 
-            results = []
+            slots = []
             attendees = []
             attendees.extend([{"email": x} for x in emails])
 
@@ -230,25 +331,32 @@ class SuggestParticipantAvailability(BaseTool):
                     st, et, lunch_hours = p[0], p[1], p[2]
 
                     available_slots = [
-                        {**x, **{"lunch_hours": lunch_hours, "attendees": attendees}}
-                        for x in determine_for_one_period(
+                        (window_start, window_end, lunch_hours)
+                        for window_start, window_end in determine_for_one_period(
                             st,
                             et,
                             meeting_min_duration,
-                            email_to_credential_map,
+                            merged_busy,
+                            max_slots=MAX_SUGGESTED_SLOTS - len(slots),
                         )
                     ]
 
-                    results.extend(available_slots)
+                    slots.extend(available_slots)
 
-                # early return
-                if len(results) > 10:
-                    results = results[:10]
-                    break
+                    # early return
+                    if len(slots) >= MAX_SUGGESTED_SLOTS:
+                        return format_slots(slots, SGT, attendees)
 
-            return results
+            return format_slots(slots, SGT, attendees)
+        except (HttpError, ValueError, KeyError) as e:
+            logger.exception("Failed to suggest participant availability")
+            return {
+                "error": "could not suggest participant availability",
+                "details": f"{type(e).__name__}: {e}",
+            }
         except Exception:
-            return str(traceback.format_exc())
+            logger.exception("Unexpected error suggesting participant availability")
+            return {"error": "internal error while suggesting participant availability"}
 
 
 def generate_work_blocks(start, end):
@@ -287,45 +395,29 @@ def split_working_hours(start, end):
         "Use timezone-aware datetimes"
     )
 
-    WORK_START = datetime.time(9, 30)
-    LUNCH_START = datetime.time(12, 0)
-    LUNCH_END = datetime.time(14, 0)
-    WORK_END = datetime.time(18, 30)
-
     current = start
     results = []
 
     while current < end:
-        day = current.date()
-        tz = current.tzinfo
+        day_periods = _unclamped_day_periods(current.date(), current.tzinfo)
 
-        # Define periods: (start, end, is_lunch_break)
-        day_blocks = [
-            (
-                datetime.datetime.combine(day, WORK_START, tz),
-                datetime.datetime.combine(day, LUNCH_START, tz),
-                False,
-            ),
-            (
-                datetime.datetime.combine(day, LUNCH_START, tz),
-                datetime.datetime.combine(day, LUNCH_END, tz),
-                True,
-            ),
-            (
-                datetime.datetime.combine(day, LUNCH_END, tz),
-                datetime.datetime.combine(day, WORK_END, tz),
-                False,
-            ),
-        ]
-
-        for block_start, block_end, is_lunch in day_blocks:
+        for block_start, block_end, is_lunch in day_periods:
             slot_start = max(current, block_start)
             slot_end = min(end, block_end)
             if slot_start < slot_end:
                 results.append((slot_start, slot_end, is_lunch))
 
-        current = datetime.datetime.combine(
-            day + datetime.timedelta(days=1), WORK_START, tz
-        )
+        current = day_periods[0][0] + datetime.timedelta(days=1)
 
     return results
+
+
+@functools.lru_cache(maxsize=512)
+def _unclamped_day_periods(day, tz):
+    # Searches keep covering the same upcoming days, so build each day's
+    # periods once and let callers clamp them to their own range
+    day_midnight = datetime.datetime.combine(day, datetime.time.min, tz)
+    return tuple(
+        (day_midnight + start_offset, day_midnight + end_offset, is_lunch)
+        for start_offset, end_offset, is_lunch in PERIOD_OFFSETS
+    )